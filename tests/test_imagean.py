@@ -0,0 +1,194 @@
+import itertools
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from core.imagean.imagean import ImageViewer, _FFT_COMPONENTS
+
+
+class FFTComponentCacheTest(unittest.TestCase):
+    """Display components must follow the spectrum they are derived from"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.viewer = ImageViewer()
+        pixels = rng.integers(0, 256, (32, 40), dtype=np.uint8)
+        self.viewer.load_image('img1', Image.fromarray(pixels))
+
+    def _assert_component_matches_spectrum(self, component):
+        # Independent dense float64 reference, not the cached half spectrum
+        image_obj = self.viewer.get_image('img1')
+        reference = np.fft.fftshift(np.fft.fft2(image_obj.current.astype(np.float64)))
+        actual = image_obj.get_fft_component(component).current
+        atol = 1e-5 * np.abs(reference).max()
+        if component == 'phase':
+            # Compare angles on the circle, where the magnitude defines them
+            defined = np.abs(reference) > atol
+            difference = np.angle(np.exp(1j * (actual - np.angle(reference))))
+            np.testing.assert_allclose(difference[defined], 0, atol=1e-3)
+        else:
+            np.testing.assert_allclose(actual, _FFT_COMPONENTS[component](reference),
+                                       rtol=0, atol=atol)
+
+    def test_component_after_adjustment(self):
+        for component in _FFT_COMPONENTS:
+            self.viewer.get_fft_component_visualization('img1', component)
+        # Unclipped, so the spectrum is derived from the original by linearity
+        self.viewer.apply_brightness_contrast('img1', 0.8, 0.6)
+        for component in _FFT_COMPONENTS:
+            self._assert_component_matches_spectrum(component)
+
+    def test_component_after_reset(self):
+        self.viewer.apply_brightness_contrast('img1', 1.5, 0.5)
+        self.viewer.get_fft_component_visualization('img1', 'magnitude')
+        self.viewer.get_image('img1').reset()
+        self._assert_component_matches_spectrum('magnitude')
+
+
+class MixShapeTest(unittest.TestCase):
+    """Weighted mix inputs must share the mix shape"""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.viewer = ImageViewer()
+        for key, shape in (('img1', (20, 30)), ('img2', (25, 30))):
+            pixels = rng.integers(0, 256, shape, dtype=np.uint8)
+            self.viewer.load_image(key, Image.fromarray(pixels))
+        self.modes = {'img1': 'magnitude_phase', 'img2': 'magnitude_phase'}
+        self.region = {'x': 0, 'y': 0, 'width': 1.0, 'height': 1.0, 'type': 'inner'}
+
+    def test_weighted_image_with_other_shape(self):
+        with self.assertRaises(ValueError):
+            self.viewer.mix_images(self.modes, {'img1': 1.0, 'img2': 1.0},
+                                   {'img1': 1.0, 'img2': 1.0}, self.region)
+
+    def test_unweighted_image_with_other_shape(self):
+        output = self.viewer.mix_images(self.modes, {'img1': 1.0, 'img2': 0.0},
+                                        {'img1': 1.0}, self.region)
+        self.assertEqual(output.shape, (20, 30))
+
+
+def _dense_mix(images, modes, weights_a, weights_b, bounds, phase_overrides=None):
+    """Reference mix: full shifted fft2 of every image, a dense mask, ifft2
+
+    phase_overrides maps an image key to {(row, col): phase} in shifted
+    coordinates, to pin the +/-pi phase of negative real bins.
+    """
+    first_key = next(iter(images))
+    shape = images[first_key].shape
+    y_start, y_end, x_start, x_end, mask_type = bounds
+    mask = np.zeros(shape) if mask_type == 'inner' else np.ones(shape)
+    mask[y_start:y_end, x_start:x_end] = 1.0 if mask_type == 'inner' else 0.0
+
+    mixed_1 = np.zeros(shape)
+    mixed_2 = np.zeros(shape)
+    for key, image in images.items():
+        spectrum = np.fft.fftshift(np.fft.fft2(image.astype(np.float64)))
+        if modes[key] == 'magnitude_phase':
+            comp_1, comp_2 = np.abs(spectrum), np.angle(spectrum)
+            for index, phase in (phase_overrides or {}).get(key, {}).items():
+                comp_2[index] = phase
+        else:
+            comp_1, comp_2 = spectrum.real, spectrum.imag
+        mixed_1 += comp_1 * mask * weights_a.get(key, 0.0)
+        mixed_2 += comp_2 * mask * weights_b.get(key, 0.0)
+
+    if modes[first_key] == 'magnitude_phase':
+        combined = mixed_1 * np.exp(1j * mixed_2)
+    else:
+        combined = mixed_1 + 1j * mixed_2
+    spatial = np.abs(np.fft.ifft2(np.fft.ifftshift(combined)))
+    return np.clip(spatial, 0, 255).astype(np.uint8)
+
+
+class MixReferenceTest(unittest.TestCase):
+    """mix_images must match a dense fft2/ifft2 mix of the same inputs"""
+
+    def _load(self, shape, parity):
+        rng = np.random.default_rng(2)
+        rows, cols = np.indices(shape)
+        viewer = ImageViewer()
+        for key in ('img1', 'img2', 'img3'):
+            # Stripes and a checkerboard on even pixels make the Nyquist bins
+            # positive; on odd pixels, negative real with a +/-pi phase
+            pixels = (rng.integers(0, 100, shape) + 50 * (rows % 2 == parity) +
+                      50 * (cols % 2 == parity) + 50 * ((rows + cols) % 2 == parity))
+            viewer.load_image(key, Image.fromarray(pixels.astype(np.uint8)))
+        # Cover a spectrum derived from the original by linearity too
+        viewer.apply_brightness_contrast('img2', 0.8, 0.6)
+        return viewer
+
+    @staticmethod
+    def _phase_overrides(viewer, shape):
+        """Phase of the real negative self-conjugate bins, as the viewer sees it
+
+        Whether such a bin has phase pi or -pi depends only on the sign of
+        its zero imaginary part, an arbitrary detail of the FFT used. Only
+        that sign is taken from the viewer's spectrum.
+        """
+        height, width = shape
+        rows = [0, height // 2] if height % 2 == 0 else [0]
+        cols = [0, width // 2] if width % 2 == 0 else [0]
+        overrides = {}
+        for key in viewer.get_all_images():
+            spectrum = viewer.get_image(key).spectrum
+            overrides[key] = {
+                ((row + height // 2) % height, (col + width // 2) % width):
+                    -np.pi if np.signbit(spectrum[row, col].imag) else np.pi
+                for row in rows for col in cols if spectrum[row, col].real < 0
+            }
+        return overrides
+
+    @staticmethod
+    def _region(shape, rows, cols, mask_type):
+        """Normalized region parameters selecting exactly the given pixel ranges"""
+        height, width = shape
+        return {'y': (rows[0] + 0.5) / height, 'height': (rows[1] - rows[0] + 0.5) / height,
+                'x': (cols[0] + 0.5) / width, 'width': (cols[1] - cols[0] + 0.5) / width,
+                'type': mask_type}
+
+    def _regions(self, shape):
+        """Full, symmetric and non-symmetric regions, inner and outer"""
+        height, width = shape
+        center_y, center_x = height // 2, width // 2
+        symmetric = ((center_y - 4, center_y + 5), (center_x - 5, center_x + 6))
+        shifted = ((center_y - 3, center_y + 7), (center_x - 6, center_x + 3))
+        regions = [({'x': 0, 'y': 0, 'width': 1.0, 'height': 1.0, 'type': 'inner'}, True)]
+        for mask_type in ('inner', 'outer'):
+            regions.append((self._region(shape, *symmetric, mask_type), True))
+            regions.append((self._region(shape, *shifted, mask_type), False))
+        return regions
+
+    def test_against_dense_reference(self):
+        weights = [({'img1': 1.0}, {'img1': 1.0}),
+                   ({'img1': 0.6, 'img2': 0.4}, {'img1': 0.3, 'img3': 0.7}),
+                   ({'img1': 0.2, 'img2': 0.5, 'img3': 0.3}, {'img2': 0.5, 'img3': 0.5})]
+        mode_sets = [dict.fromkeys(('img1', 'img2', 'img3'), 'magnitude_phase'),
+                     dict.fromkeys(('img1', 'img2', 'img3'), 'real_imaginary'),
+                     {'img1': 'magnitude_phase', 'img2': 'real_imaginary',
+                      'img3': 'magnitude_phase'}]
+        for shape, parity in itertools.product(((32, 48), (33, 45), (32, 45)), (0, 1)):
+            viewer = self._load(shape, parity)
+            images = {key: viewer.get_image(key).current
+                      for key in viewer.get_all_images()}
+            overrides = self._phase_overrides(viewer, shape)
+            for region, symmetric in self._regions(shape):
+                bounds = viewer._get_region_bounds(shape, region)
+                self.assertEqual(viewer._get_frequency_mask(shape, region).symmetric,
+                                 symmetric)
+                for modes in mode_sets:
+                    for weights_a, weights_b in weights:
+                        with self.subTest(shape=shape, parity=parity, bounds=bounds,
+                                          modes=modes, weights_a=weights_a,
+                                          weights_b=weights_b):
+                            output = viewer.mix_images(modes, weights_a, weights_b, region)
+                            expected = _dense_mix(images, modes, weights_a, weights_b,
+                                                  bounds, overrides)
+                            difference = np.abs(output.astype(int) - expected)
+                            # Single-precision rounding may flip a truncation
+                            self.assertLessEqual(difference.max(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()